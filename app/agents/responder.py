@@ -1,8 +1,14 @@
+import threading
+import time
+from collections import OrderedDict
 from typing import Dict, Any
 from langchain_openai import ChatOpenAI
 from langchain.schema import HumanMessage, SystemMessage
 from app.agents.base import BaseAgent
 from app.config import get_settings
+from app.services.circuit_breaker import CircuitOpenError
+from app.services.hedging import LLMDeadlineExceeded, create_llm_caller
+from app.services.profiling import profile_span
 
 
 class ResponderAgent(BaseAgent):
@@ -16,7 +22,16 @@ class ResponderAgent(BaseAgent):
             temperature=self.settings.temperature,
             max_tokens=self.settings.max_tokens,
             openai_api_key=self.settings.openai_api_key,
+            base_url=self.settings.openai_base_url,
+            # Retries and hedging are handled by the hedged caller; the client timeout
+            # bounds calls it stopped waiting for, which it cannot cancel
+            timeout=self.settings.request_timeout_seconds,
+            max_retries=0,
         )
+        self.llm_caller = create_llm_caller("responder")
+        # Recent answers per catalog, served when the LLM circuit is open
+        self._answer_cache: "OrderedDict[tuple, str]" = OrderedDict()
+        self._cache_lock = threading.Lock()
 
     def _build_system_prompt(self) -> str:
         """Build the system prompt for response generation"""
@@ -49,6 +64,48 @@ Please provide a helpful response based on the context above."""
 
 Note: No specific product context was retrieved. Please respond appropriately to the user's query."""
 
+    def _cache_answer(self, key: tuple, answer: str):
+        """Remember an answer, evicting the least recently used one when full"""
+        with self._cache_lock:
+            self._answer_cache[key] = answer
+            self._answer_cache.move_to_end(key)
+            if len(self._answer_cache) > self.settings.answer_cache_size:
+                self._answer_cache.popitem(last=False)
+
+    def invalidate_catalog(self, catalog_id: str):
+        """Drop cached answers for a catalog whose index changed"""
+        with self._cache_lock:
+            for key in [key for key in self._answer_cache if key[0] == catalog_id]:
+                del self._answer_cache[key]
+
+    def _degraded_response(self, key: tuple, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Answer without the LLM (circuit open or budget spent): cached answer, then the top retrieved document"""
+        with self._cache_lock:
+            cached = self._answer_cache.get(key)
+        if cached is not None:
+            return {
+                "answer": cached,
+                "confidence_score": 0.7,
+                "answer_source": "cache",
+                "processing_successful": True,
+            }
+
+        retrieved_docs = state.get("retrieved_docs") or []
+        if retrieved_docs:
+            return {
+                "answer": f"Here is the closest match I found: {retrieved_docs[0]['content']}",
+                "confidence_score": 0.5,
+                "answer_source": "extractive",
+                "processing_successful": True,
+            }
+
+        return {
+            "answer": "I'm experiencing high demand right now. Please try again in a moment.",
+            "confidence_score": 0.0,
+            "answer_source": "fallback",
+            "processing_successful": True,
+        }
+
     def execute(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """Generate response based on retrieved context and user query"""
         query = state.get("query", "")
@@ -60,9 +117,19 @@ Note: No specific product context was retrieved. Please respond appropriately to
             HumanMessage(content=self._build_user_prompt(query, context)),
         ]
 
+        cache_key = (state.get("catalog_id", ""), query.lower().strip(), context)
+
+        # Generation gets whatever is left of the request deadline
+        deadline = state.get("deadline") or time.monotonic() + self.settings.request_timeout_seconds
+        budget = deadline - time.monotonic()
+        if budget <= 0:
+            return self._degraded_response(cache_key, state)
+
         try:
             # Generate response
-            response = self.llm.invoke(messages)
+            with profile_span("generation"):
+                response = self.llm_caller.call(self.llm.invoke, messages, timeout=budget)
+            self._cache_answer(cache_key, response.content)
 
             # Calculate a simple confidence score based on context availability
             confidence_score = 0.9 if context.strip() else 0.3
@@ -72,9 +139,13 @@ Note: No specific product context was retrieved. Please respond appropriately to
             return {
                 "answer": response.content,
                 "confidence_score": confidence_score,
+                "answer_source": "llm",
                 "processing_successful": True,
             }
 
+        except (CircuitOpenError, LLMDeadlineExceeded):
+            return self._degraded_response(cache_key, state)
+
         except Exception as e:
             return {
                 "answer": "I apologize, but I'm having technical difficulties processing your request. Please try again later.",
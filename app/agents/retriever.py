@@ -1,6 +1,7 @@
 from typing import Dict, Any
 from app.agents.base import BaseAgent
 from app.services.vector_store_service import VectorStoreService
+from app.services.profiling import profile_span
 
 class RetrieverAgent(BaseAgent):
     """Agent responsible for semantic retrieval of relevant documents"""
@@ -18,23 +19,28 @@ class RetrieverAgent(BaseAgent):
         
         try:
             # Perform semantic search
-            documents = self.vector_service.similarity_search(query)
+            documents = self.vector_service.similarity_search(
+                query,
+                catalog_id=state.get("catalog_id"),
+                deadline=state.get("deadline")
+            )
             
-            # Extract content and metadata
-            retrieved_docs = [
-                {
-                    "content": doc.page_content,
-                    "metadata": doc.metadata,
-                    "relevance_score": getattr(doc, 'score', 0.0)
-                }
-                for doc in documents
-            ]
-            
-            # Create context string for LLM
-            context = "\n\n".join([
-                f"Document {i+1}: {doc['content']}" 
-                for i, doc in enumerate(retrieved_docs)
-            ])
+            with profile_span("context_build"):
+                # Extract content and metadata
+                retrieved_docs = [
+                    {
+                        "content": doc.page_content,
+                        "metadata": doc.metadata,
+                        "relevance_score": getattr(doc, 'score', 0.0)
+                    }
+                    for doc in documents
+                ]
+                
+                # Create context string for LLM
+                context = "\n\n".join([
+                    f"Document {i+1}: {doc['content']}" 
+                    for i, doc in enumerate(retrieved_docs)
+                ])
             
             return {
                 "retrieved_docs": retrieved_docs,
@@ -1,7 +1,11 @@
-from typing import Literal
+import time
+from typing import Literal, Optional
 from langchain_openai import ChatOpenAI
 from langchain.schema import SystemMessage, HumanMessage
 from app.config import get_settings
+from app.services.circuit_breaker import CircuitOpenError
+from app.services.hedging import LLMDeadlineExceeded, create_llm_caller
+from app.services.profiling import profile_span
 
 class RouterAgent:
     """Intelligent intent router using LLM with optimization"""
@@ -12,20 +16,26 @@ class RouterAgent:
             model=self.settings.chat_model,
             temperature=self.settings.temperature,
             max_tokens=self.settings.max_tokens,
-            openai_api_key=self.settings.openai_api_key
+            openai_api_key=self.settings.openai_api_key,
+            base_url=self.settings.openai_base_url,
+            # Retries and hedging are handled by the hedged caller; the client timeout
+            # bounds calls it stopped waiting for, which it cannot cancel
+            timeout=self.settings.request_timeout_seconds,
+            max_retries=0
         )
+        self.llm_caller = create_llm_caller("router")
         # Cache to avoid repeated API calls for same queries
         self._classification_cache = {}
         # Statistics for monitoring
         self._cache_hits = 0
         self._llm_calls = 0
     
-    def classify_intent(self, query: str) -> Literal["product_query", "general_conversation"]:
+    def classify_intent(self, query: str, deadline: Optional[float] = None) -> Literal["product_query", "general_conversation"]:
         """
         Classify user intent with multi-layer approach:
         1. Cache lookup (fastest)
         2. Heuristic rules (fast)
-        3. LLM classification (accurate but slower)
+        3. LLM classification (accurate but slower), bounded by the request deadline
         """
         
         # Layer 1: Check cache
@@ -35,13 +45,17 @@ class RouterAgent:
             return self._classification_cache[cache_key]
         
         # Layer 2: Fast heuristics for obvious cases
-        heuristic_result = self._apply_heuristics(query)
+        with profile_span("heuristics"):
+            heuristic_result = self._apply_heuristics(query)
         if heuristic_result:
             self._classification_cache[cache_key] = heuristic_result
             return heuristic_result
         
         # Layer 3: LLM classification for ambiguous cases
-        llm_result = self._llm_classify(query)
+        llm_result = self._llm_classify(query, deadline)
+        if llm_result is None:
+            # No answer within budget - don't cache the fallback
+            return "product_query"
         self._classification_cache[cache_key] = llm_result
         return llm_result
     
@@ -90,8 +104,17 @@ class RouterAgent:
         # If nothing matches heuristics, use LLM
         return None
     
-    def _llm_classify(self, query: str) -> Literal["product_query", "general_conversation"]:
-        """Use LLM for nuanced classification"""
+    def _stage_budget(self, deadline: Optional[float]) -> float:
+        """Latency budget for classification, taken from the request's remaining deadline"""
+        if deadline is None:
+            return self.settings.router_budget_seconds
+        return min(self.settings.router_budget_seconds, deadline - time.monotonic())
+    
+    def _llm_classify(self, query: str, deadline: Optional[float] = None) -> Literal["product_query", "general_conversation", None]:
+        """Use LLM for nuanced classification, returning None if it can't answer in time"""
+        budget = self._stage_budget(deadline)
+        if budget <= 0:
+            return None
         
         system_prompt = """You are a precise intent classifier for an e-commerce chatbot.
 
@@ -124,7 +147,8 @@ Respond with exactly one word: PRODUCT or CHAT"""
                 HumanMessage(content=f"Query: {query}")
             ]
             
-            response = self.llm.invoke(messages)
+            with profile_span("router_llm"):
+                response = self.llm_caller.call(self.llm.invoke, messages, timeout=budget)
             classification = response.content.strip().upper()
             
             # Parse response
@@ -138,6 +162,9 @@ Respond with exactly one word: PRODUCT or CHAT"""
                 print(f"Ambiguous LLM response '{classification}' for query '{query}', defaulting to product_query")
                 return "product_query"
                 
+        except (CircuitOpenError, LLMDeadlineExceeded) as e:
+            print(f"LLM classification skipped for query '{query}': {e}")
+            return None
         except Exception as e:
             print(f"LLM classification failed for query '{query}': {e}")
             # Safe default: assume product query to be helpful
@@ -0,0 +1,186 @@
+import re
+from typing import Dict, Any, Optional
+from app.agents.base import BaseAgent
+
+# Generic product words that don't identify a specific model
+GENERIC_WORDS = {"sneakers", "sneaker", "shoes", "shoe", "running", "walking"}
+
+# Spellings and shades folded into one form so "gray" matches a "grey" colorway
+COLOR_SYNONYMS = {
+    "gray": "grey", "charcoal": "grey", "navy": "blue", "crimson": "red", "scarlet": "red",
+    "burgundy": "red", "ivory": "white", "cream": "beige", "tan": "beige", "olive": "green",
+}
+
+COLORS = {
+    "black", "white", "red", "blue", "grey", "green", "yellow", "pink",
+    "purple", "orange", "brown", "silver", "gold", "beige",
+} | set(COLOR_SYNONYMS)
+
+PRICE_RE = re.compile(r"\$(\d+(?:\.\d{2})?)")
+SIZE_RE = re.compile(r"size (\d+(?:\.\d)?)")
+QUERY_SIZE_RE = re.compile(r"\bsize (\d+(?:\.\d)?)\b")
+QUERY_PRICE_RE = re.compile(r"\$\d+(?:\.\d{2})?")
+
+# Catalog sizes are EU; a requested size outside this range is on another scale
+EU_SIZE_RANGE = (30.0, 50.0)
+
+QUESTION_PATTERNS = {
+    "price": re.compile(r"\b(price|prices|cost|costs|how much)\b|\$"),
+    "size": re.compile(r"\bsizes?\b"),
+    "color": re.compile(r"\b(colou?rs?|colou?rways?)\b"),
+    "availability": re.compile(r"\b(available|availability|in stock|do you have|do you carry)\b"),
+}
+
+# Topics and comparisons a single document field can't answer
+OFF_TOPIC_RE = re.compile(
+    r"\b(shipping|ship|delivery|deliver|returns?|refunds?|exchange|warranty|discounts?|sale|coupon|"
+    r"cheaper|cheapest|expensive|than|difference|differ|compare|comparison|vs|versus|better|best|"
+    r"recommend|similar|alternatives?|reviews?|fit|fits|comfortable|comfort|material|made)\b"
+)
+
+
+class TemplateAnswerAgent(BaseAgent):
+    """Agent that answers simple attribute questions from document fields without the LLM"""
+
+    # Share of the product name's words that must appear in the query
+    MIN_NAME_MATCH = 0.5
+
+    def __init__(self):
+        super().__init__("template_agent")
+
+    def _tokenize(self, text: str) -> list:
+        return re.findall(r"[a-z0-9]+(?:-[a-z0-9]+)*", text.lower())
+
+    def _parse_product(self, content: str) -> Dict[str, str]:
+        """Parse 'Name, size N, colorway, $price, features' into fields"""
+        segments = [segment.strip() for segment in content.split(",")]
+        name_words = segments[0].split()
+        while len(name_words) > 1 and name_words[-1].lower() in GENERIC_WORDS:
+            name_words.pop()
+
+        fields = {"name": " ".join(name_words)}
+        for segment in segments[1:]:
+            size_match = SIZE_RE.fullmatch(segment)
+            price_match = PRICE_RE.fullmatch(segment)
+            if size_match:
+                fields["size"] = size_match.group(1)
+            elif price_match:
+                fields["price"] = price_match.group(1)
+            elif "colorway" in segment or "/" in segment or set(self._tokenize(segment)) & COLORS:
+                fields.setdefault("colorway", segment.replace(" colorway", ""))
+        return fields
+
+    def _color_tokens(self, text: str) -> list:
+        return [COLOR_SYNONYMS.get(token, token) for token in self._tokenize(text)]
+
+    def _name_match(self, query_tokens: set, model_tokens: set, name: str) -> float:
+        """
+        Share of the product name matched by the query; 0 unless the brand is named
+        and every model identifier in the query (e.g. '574') is part of this name
+        """
+        name_tokens = self._tokenize(name)
+        if not name_tokens or name_tokens[0] not in query_tokens:
+            return 0.0
+        if not model_tokens <= set(name_tokens):
+            return 0.0
+        return sum(token in query_tokens for token in name_tokens) / len(name_tokens)
+
+    def _model_tokens(self, query: str) -> set:
+        """Digit-bearing query tokens that aren't a requested size or price"""
+        query_lower = QUERY_PRICE_RE.sub(" ", QUERY_SIZE_RE.sub(" ", query.lower()))
+        return {token for token in self._tokenize(query_lower) if any(char.isdigit() for char in token)}
+
+    def _is_eu_size(self, size: str) -> bool:
+        return EU_SIZE_RANGE[0] <= float(size) <= EU_SIZE_RANGE[1]
+
+    def _detect_question_type(self, query: str, requested_color: Optional[str]) -> Optional[str]:
+        """Detect a single-attribute question, or None for anything else"""
+        query_lower = query.lower()
+        question_types = {
+            question_type for question_type, pattern in QUESTION_PATTERNS.items()
+            if pattern.search(query_lower)
+        }
+        if requested_color:
+            question_types.add("color")
+
+        # "Is X available in white?" / "Do you have X in size 42?" ask about the attribute
+        if len(question_types) > 1:
+            question_types.discard("availability")
+        if len(question_types) != 1:
+            return None
+        return question_types.pop()
+
+    def _render(self, question_type: str, fields: Dict[str, str], query: str, requested_color: Optional[str]) -> Optional[str]:
+        """Fill the answer template, or None if a needed field is missing"""
+        name = fields["name"]
+
+        if question_type == "price" and "price" in fields:
+            return f"The {name} costs ${fields['price']}."
+
+        if question_type == "size" and "size" in fields:
+            requested_size = QUERY_SIZE_RE.search(query.lower())
+            if not requested_size:
+                return f"The {name} is available in size {fields['size']}."
+            if float(requested_size.group(1)) == float(fields["size"]):
+                return f"Yes, the {name} is available in size {fields['size']}."
+            # Only say no when both sizes are on the same scale (a US 9 is not an EU 39)
+            if self._is_eu_size(requested_size.group(1)) and self._is_eu_size(fields["size"]):
+                return f"Sorry, the {name} is only available in size {fields['size']}."
+            return None
+
+        if question_type == "color" and "colorway" in fields:
+            if not requested_color:
+                return f"The {name} comes in {fields['colorway']}."
+            colorway_tokens = self._color_tokens(fields["colorway"])
+            if requested_color in colorway_tokens:
+                return f"Yes, the {name} is available in {fields['colorway']}."
+            # Only say no when the colorway is spelled out in plain colors ("bred" is black and red)
+            if all(token in COLORS for token in colorway_tokens):
+                return f"Sorry, the {name} is only available in {fields['colorway']}."
+            return None
+
+        if question_type == "availability":
+            details = [
+                f"size {fields['size']}" if "size" in fields else None,
+                fields.get("colorway"),
+                f"${fields['price']}" if "price" in fields else None,
+            ]
+            details = [detail for detail in details if detail]
+            if details:
+                return f"Yes, we have the {name} available: {', '.join(details)}."
+
+        return None
+
+    def execute(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Answer from the top retrieved document when it clearly matches a simple question"""
+        query = state.get("query", "")
+        retrieved_docs = state.get("retrieved_docs") or []
+        if not query or not retrieved_docs or OFF_TOPIC_RE.search(query.lower()):
+            return {}
+
+        query_tokens = set(self._tokenize(query))
+        requested_colors = {token for token in self._color_tokens(query) if token in COLORS}
+        if len(requested_colors) > 1:
+            return {}
+        requested_color = next(iter(requested_colors), None)
+        question_type = self._detect_question_type(query, requested_color)
+        if not question_type:
+            return {}
+
+        # The top document must name the product asked about, and no other document may match as well
+        products = [self._parse_product(doc["content"]) for doc in retrieved_docs]
+        model_tokens = self._model_tokens(query)
+        scores = [self._name_match(query_tokens, model_tokens, product["name"]) for product in products]
+        if scores[0] < self.MIN_NAME_MATCH or any(score >= scores[0] for score in scores[1:]):
+            return {}
+
+        answer = self._render(question_type, products[0], query, requested_color)
+        if not answer:
+            return {}
+
+        return {
+            "answer": answer,
+            "confidence_score": 0.9,
+            "answer_source": "template",
+            "processing_successful": True,
+        }
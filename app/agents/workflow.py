@@ -1,19 +1,28 @@
-from typing import Dict, Any, Literal
+import threading
+import time
+from contextlib import nullcontext
+from typing import Dict, Any, Literal, Optional
 from langgraph.graph import StateGraph, START, END
 from langgraph.checkpoint.memory import InMemorySaver
 from app.agents.retriever import RetrieverAgent  
 from app.agents.responder import ResponderAgent
 from app.agents.router import RouterAgent
+from app.agents.template_answer import TemplateAnswerAgent
+from app.config import get_settings
+from app.services.profiling import profile_request, profile_span
 
 class AgentState(dict):
     """State class for the agent workflow"""
     user_id: str
     query: str
+    catalog_id: str = ""
+    deadline: float = 0.0  # time.monotonic() by which the answer is due
     intent: str = ""  # Add intent tracking
     retrieved_docs: list = []
     context: str = ""
     answer: str = ""
     confidence_score: float = 0.0
+    answer_source: str = ""
     processing_successful: bool = False
 
 class MultiAgentWorkflow:
@@ -23,6 +32,12 @@ class MultiAgentWorkflow:
         self.retriever_agent = RetrieverAgent()
         self.responder_agent = ResponderAgent()
         self.intent_router = RouterAgent()
+        self.template_agent = TemplateAnswerAgent()
+        # Per-tenant caches are dropped when that tenant's index changes
+        self.retriever_agent.vector_service.add_change_listener(self.responder_agent.invalidate_catalog)
+        # Per answer tier (template, llm, cache, ...) request counts and latency
+        self._tier_stats: Dict[str, Dict[str, float]] = {}
+        self._tier_lock = threading.Lock()
         self.checkpointer = InMemorySaver()
         self.app = self._build_workflow()
     
@@ -36,7 +51,8 @@ class MultiAgentWorkflow:
             return "responder"
         
         # Use smart router to classify intent
-        intent = self.intent_router.classify_intent(query)
+        with profile_span("router", "nodes"):
+            intent = self.intent_router.classify_intent(query, state.get("deadline"))
         state["intent"] = intent  # Store intent in state for debugging/analytics
         
         # Route based on classification
@@ -47,17 +63,30 @@ class MultiAgentWorkflow:
     
     def _retriever_node(self, state: AgentState) -> AgentState:
         """Execute retriever agent with intent context"""
-        result = self.retriever_agent.execute(state)
+        with profile_span("retriever", "nodes"):
+            result = self.retriever_agent.execute(state)
         state.update(result)
         return state
     
+    def _template_node(self, state: AgentState) -> AgentState:
+        """Answer simple attribute questions from the retrieved documents"""
+        with profile_span("template", "nodes"):
+            result = self.template_agent.execute(state)
+        state.update(result)
+        return state
+    
+    def _route_after_template(self, state: AgentState) -> Literal["responder", "end"]:
+        """Skip the LLM when the template tier already answered"""
+        return "end" if state.get("answer_source") == "template" else "responder"
+    
     def _responder_node(self, state: AgentState) -> AgentState:
         """Execute responder agent with intent awareness"""
         # Add intent information to help responder
         if "intent" not in state:
             state["intent"] = "unknown"
             
-        result = self.responder_agent.execute(state)
+        with profile_span("responder", "nodes"):
+            result = self.responder_agent.execute(state)
         state.update(result)
         return state
     
@@ -69,6 +98,9 @@ class MultiAgentWorkflow:
         workflow.add_node("retriever", self._retriever_node)
         workflow.add_node("responder", self._responder_node)
         
+        if get_settings().template_answers_enabled:
+            workflow.add_node("template", self._template_node)
+        
         # Smart conditional routing from START
         workflow.add_conditional_edges(
             START,
@@ -79,35 +111,74 @@ class MultiAgentWorkflow:
             }
         )
         
-        # Retriever always flows to responder
-        workflow.add_edge("retriever", "responder")
+        # Retriever flows to the template tier, which falls back to the responder
+        if get_settings().template_answers_enabled:
+            workflow.add_edge("retriever", "template")
+            workflow.add_conditional_edges(
+                "template",
+                self._route_after_template,
+                {
+                    "responder": "responder",
+                    "end": END
+                }
+            )
+        else:
+            workflow.add_edge("retriever", "responder")
         
         # Responder ends the workflow
         workflow.add_edge("responder", END)
         
         return workflow.compile(checkpointer=self.checkpointer)
     
-    def process_query(self, user_id: str, query: str) -> Dict[str, Any]:
-        """Process a query through the multi-agent workflow"""
-        config = {"configurable": {"thread_id": user_id}}
+    def process_query(
+        self,
+        user_id: str,
+        query: str,
+        deadline: Optional[float] = None,
+        profile: bool = False,
+        catalog_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Process a query through the multi-agent workflow, optionally profiling it"""
+        settings = get_settings()
+        catalog_id = catalog_id or settings.default_catalog_id
+        # Conversations are per user within a catalog
+        config = {"configurable": {"thread_id": f"{catalog_id}:{user_id}"}}
+        
+        if deadline is None:
+            deadline = time.monotonic() + settings.request_timeout_seconds
         
         initial_state = AgentState({
             "user_id": user_id,
-            "query": query
+            "query": query,
+            "catalog_id": catalog_id,
+            "deadline": deadline,
+            "answer_source": ""
         })
         
         try:
-            result = self.app.invoke(initial_state, config)
+            profiler = profile_request(
+                settings.profile_output_dir,
+                settings.profile_sample_interval_ms / 1000
+            ) if profile else nullcontext()
+            
+            started = time.monotonic()
+            with profiler as request_profile:
+                result = self.app.invoke(initial_state, config)
+            self._record_tier(result.get("answer_source") or "unknown", time.monotonic() - started)
             
             # Include routing information in response for debugging
-            return {
+            response = {
                 "answer": result.get("answer", ""),
                 "confidence_score": result.get("confidence_score", 0.0),
                 "retrieved_docs": result.get("retrieved_docs", []),
                 "processing_successful": result.get("processing_successful", False),
                 "intent": result.get("intent", "unknown"),  # For analytics
+                "answer_source": result.get("answer_source", "unknown"),
                 "routing_stats": self.intent_router.get_stats()  # Performance metrics
             }
+            if request_profile:
+                response["profile"] = request_profile.to_dict()
+            return response
             
         except Exception as e:
             return {
@@ -119,6 +190,39 @@ class MultiAgentWorkflow:
                 "intent": "error"
             }
     
+    def _record_tier(self, tier: str, elapsed: float):
+        with self._tier_lock:
+            stats = self._tier_stats.setdefault(tier, {"count": 0, "total_seconds": 0.0})
+            stats["count"] += 1
+            stats["total_seconds"] += elapsed
+    
+    def get_tier_stats(self) -> Dict[str, Any]:
+        """Get request counts and average latency per answer tier"""
+        with self._tier_lock:
+            return {
+                tier: {
+                    "count": stats["count"],
+                    "avg_latency_ms": round(stats["total_seconds"] / stats["count"] * 1000, 1)
+                }
+                for tier, stats in self._tier_stats.items()
+            }
+    
+    def catalog_exists(self, catalog_id: Optional[str] = None) -> bool:
+        """Whether the catalog has an index to search"""
+        return self.retriever_agent.vector_service.catalog_exists(catalog_id)
+    
+    def get_vector_store_stats(self) -> Dict[str, Any]:
+        """Get per-catalog index memory, load time and eviction statistics"""
+        return self.retriever_agent.vector_service.get_stats()
+    
+    def get_llm_stats(self) -> Dict[str, Any]:
+        """Get hedging and tail-latency statistics per LLM stage"""
+        return {
+            "router": self.intent_router.llm_caller.get_stats(),
+            "responder": self.responder_agent.llm_caller.get_stats(),
+            "embedding": self.retriever_agent.vector_service.embedding_caller.get_stats()
+        }
+    
     def get_routing_performance(self) -> Dict[str, Any]:
         """Get routing performance statistics"""
         return self.intent_router.get_stats()
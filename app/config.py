@@ -1,4 +1,5 @@
 from functools import lru_cache
+from typing import Optional
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -9,6 +10,34 @@ class Settings(BaseSettings):
     temperature: float
     max_tokens: int
     vector_store_path: str
+    # Multi-catalog indexes: <catalogs_dir>/<catalog_id>, default catalog at vector_store_path
+    catalogs_dir: str = "./data/catalogs"
+    default_catalog_id: str = "default"
+    max_index_memory_mb: int = 512
+    openai_base_url: Optional[str] = None
+    # Admission control and load shedding
+    max_concurrent_requests: int = 8
+    max_queued_requests: int = 32
+    request_timeout_seconds: float = 30.0
+    rate_limit_per_second: float = 1.0
+    rate_limit_burst: int = 5
+    # Circuit breaker around OpenAI chat calls
+    breaker_failure_threshold: int = 5
+    breaker_recovery_seconds: float = 30.0
+    answer_cache_size: int = 256
+    embedding_cache_size: int = 1024
+    # Hedged, deadline-aware LLM calls
+    llm_hedge_percentile: float = 95.0
+    llm_initial_hedge_delay_seconds: float = 2.0
+    llm_max_retries: int = 2
+    llm_retry_backoff_seconds: float = 0.2
+    router_budget_seconds: float = 3.0
+    # Answer simple attribute questions from document fields, skipping the LLM
+    template_answers_enabled: bool = True
+    # Opt-in per-request profiling (X-Profile header or ?profile=true)
+    profiling_enabled: bool = False
+    profile_output_dir: Optional[str] = None
+    profile_sample_interval_ms: float = 5.0
     
     class Config:
         env_file = ".env"
@@ -1,14 +1,20 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 class QueryRequest(BaseModel):
     user_id: str = Field(..., description="Unique identifier for the user")
     query: str = Field(..., min_length=1, description="User's query about products")
+    catalog_id: Optional[str] = Field(
+        None,
+        pattern=r"^[A-Za-z0-9_-]{1,64}$",
+        description="Catalog (storefront) to search; the default catalog if omitted"
+    )
 
 class QueryResponse(BaseModel):
     answer: str
     retrieved_docs: Optional[List[str]] = None
     confidence_score: Optional[float] = None
+    profile: Optional[Dict[str, Any]] = Field(None, description="Wall-time breakdown, only for profiled requests")
 
 class Document(BaseModel):
     content: str
@@ -1,17 +1,54 @@
-from fastapi import APIRouter, HTTPException
+import time
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Header, Query
+from fastapi.concurrency import run_in_threadpool
 from app.models.schemas import QueryRequest, QueryResponse
 from app.agents.workflow import workflow
+from app.config import get_settings
+from app.services.admission import AdmissionRejected, get_admission_controller, get_rate_limiter
+from app.services.circuit_breaker import get_llm_breaker
 
 router = APIRouter(prefix="/api", tags=["queries"])
 
 @router.post("/query", response_model=QueryResponse)
-async def handle_query(request: QueryRequest) -> QueryResponse:
+async def handle_query(
+    request: QueryRequest,
+    x_request_timeout_ms: Optional[int] = Header(None, description="Client deadline for this request in milliseconds"),
+    x_profile: bool = Header(False, description="Profile this request"),
+    profile: bool = Query(False, description="Profile this request"),
+) -> QueryResponse:
     """
     Handle user queries about products using multi-agent RAG pipeline
     """
+    settings = get_settings()
+    
+    profile = profile or x_profile
+    if profile and not settings.profiling_enabled:
+        raise HTTPException(status_code=403, detail="Request profiling is disabled")
+
+    # Per-request deadline: the client's budget, capped by the server timeout
+    timeout = settings.request_timeout_seconds
+    if x_request_timeout_ms is not None:
+        timeout = min(timeout, x_request_timeout_ms / 1000)
+    deadline = time.monotonic() + timeout
+
+    if not workflow.catalog_exists(request.catalog_id):
+        raise HTTPException(status_code=404, detail=f"Unknown catalog '{request.catalog_id}'")
+    
+    if not get_rate_limiter().allow(request.user_id):
+        raise HTTPException(status_code=429, detail="Rate limit exceeded, please slow down")
+
     try:
-        # Process query through multi-agent workflow
-        result = workflow.process_query(request.user_id, request.query)
+        async with get_admission_controller().slot(deadline):
+            # Process query through multi-agent workflow off the event loop
+            result = await run_in_threadpool(
+                workflow.process_query,
+                request.user_id,
+                request.query,
+                deadline=deadline,
+                profile=profile,
+                catalog_id=request.catalog_id
+            )
         
         if not result.get("processing_successful", False):
             raise HTTPException(
@@ -22,9 +59,12 @@ async def handle_query(request: QueryRequest) -> QueryResponse:
         return QueryResponse(
             answer=result["answer"],
             retrieved_docs=[doc.get("content", "") for doc in result.get("retrieved_docs", [])],
-            confidence_score=result.get("confidence_score")
+            confidence_score=result.get("confidence_score"),
+            profile=result.get("profile")
         )
         
+    except AdmissionRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.reason)
     except HTTPException:
         raise
     except Exception as e:
@@ -36,4 +76,17 @@ async def handle_query(request: QueryRequest) -> QueryResponse:
 @router.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {"status": "healthy", "service": "product-query-bot"}
\ No newline at end of file
+    return {"status": "healthy", "service": "product-query-bot"}
+
+@router.get("/metrics")
+async def metrics():
+    """Admission, rate limiting, circuit breaker, LLM hedging, answer tier, index and routing metrics"""
+    return {
+        "admission": get_admission_controller().get_stats(),
+        "rate_limiter": get_rate_limiter().get_stats(),
+        "llm_circuit_breaker": get_llm_breaker().get_stats(),
+        "llm_calls": workflow.get_llm_stats(),
+        "answer_tiers": workflow.get_tier_stats(),
+        "vector_store": workflow.get_vector_store_stats(),
+        "routing": workflow.get_routing_performance(),
+    }
@@ -0,0 +1,131 @@
+import asyncio
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import Dict, Any, Optional
+from app.config import get_settings
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is shed before doing any work"""
+
+    def __init__(self, status_code: int, reason: str):
+        super().__init__(reason)
+        self.status_code = status_code
+        self.reason = reason
+
+
+class AdmissionController:
+    """Concurrency limiter with a bounded wait queue and per-request deadlines"""
+
+    def __init__(self, max_concurrency: int, max_queue_size: int):
+        self.max_concurrency = max_concurrency
+        self.max_queue_size = max_queue_size
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._active = 0
+        self._waiting = 0
+        # Statistics for monitoring
+        self._admitted = 0
+        self._rejected_queue_full = 0
+        self._rejected_deadline = 0
+
+    @asynccontextmanager
+    async def slot(self, deadline: float):
+        """Hold a concurrency slot, waiting at most until the deadline"""
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            self._rejected_deadline += 1
+            raise AdmissionRejected(503, "Request deadline exceeded before processing")
+
+        if self._semaphore.locked() and self._waiting >= self.max_queue_size:
+            self._rejected_queue_full += 1
+            raise AdmissionRejected(503, "Server is overloaded, please retry later")
+
+        self._waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=remaining)
+        except asyncio.TimeoutError:
+            self._rejected_deadline += 1
+            raise AdmissionRejected(503, "Request deadline exceeded while queued")
+        finally:
+            self._waiting -= 1
+
+        self._active += 1
+        self._admitted += 1
+        try:
+            yield
+        finally:
+            self._active -= 1
+            self._semaphore.release()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get admission statistics"""
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue_size": self.max_queue_size,
+            "active_requests": self._active,
+            "queue_depth": self._waiting,
+            "admitted": self._admitted,
+            "rejected_queue_full": self._rejected_queue_full,
+            "rejected_deadline": self._rejected_deadline,
+        }
+
+
+class TokenBucketRateLimiter:
+    """Per-user token bucket rate limiter"""
+
+    def __init__(self, rate_per_second: float, burst: int, max_tracked_users: int = 10000):
+        self.rate_per_second = rate_per_second
+        self.burst = burst
+        self.max_tracked_users = max_tracked_users
+        # user_id -> (tokens, last_refill); ordered by recency so idle users get evicted
+        self._buckets: "OrderedDict[str, tuple]" = OrderedDict()
+        self._allowed = 0
+        self._rejected = 0
+
+    def allow(self, user_id: str, now: Optional[float] = None) -> bool:
+        """Consume one token for the user, returning False if none are left"""
+        now = time.monotonic() if now is None else now
+        tokens, last_refill = self._buckets.pop(user_id, (float(self.burst), now))
+        tokens = min(float(self.burst), tokens + (now - last_refill) * self.rate_per_second)
+
+        allowed = tokens >= 1.0
+        if allowed:
+            tokens -= 1.0
+            self._allowed += 1
+        else:
+            self._rejected += 1
+
+        self._buckets[user_id] = (tokens, now)
+        if len(self._buckets) > self.max_tracked_users:
+            self._buckets.popitem(last=False)
+        return allowed
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get rate limiting statistics"""
+        return {
+            "rate_per_second": self.rate_per_second,
+            "burst": self.burst,
+            "tracked_users": len(self._buckets),
+            "allowed": self._allowed,
+            "rejected": self._rejected,
+        }
+
+
+@lru_cache()
+def get_admission_controller() -> AdmissionController:
+    settings = get_settings()
+    return AdmissionController(
+        max_concurrency=settings.max_concurrent_requests,
+        max_queue_size=settings.max_queued_requests,
+    )
+
+
+@lru_cache()
+def get_rate_limiter() -> TokenBucketRateLimiter:
+    settings = get_settings()
+    return TokenBucketRateLimiter(
+        rate_per_second=settings.rate_limit_per_second,
+        burst=settings.rate_limit_burst,
+    )
@@ -0,0 +1,124 @@
+import threading
+import time
+from functools import lru_cache
+from typing import Callable, Dict, Any, Optional
+import openai
+from app.config import get_settings
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is short-circuited by an open breaker"""
+
+
+def is_transient_error(error: Exception) -> bool:
+    """Whether an OpenAI error may succeed on retry (timeouts, connection errors, 429, 5xx)"""
+    if isinstance(error, (openai.APIConnectionError, TimeoutError, ConnectionError)):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code == 429 or error.status_code >= 500
+    return False
+
+
+class CircuitBreaker:
+    """Circuit breaker that stops calling a failing dependency for a cool-down period"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int,
+        recovery_timeout: float,
+        is_failure: Optional[Callable[[Exception], bool]] = None,
+    ):
+        self.name = name
+        # Errors that say nothing about the dependency's health (e.g. bad requests) don't count
+        self.is_failure = is_failure or (lambda error: True)
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._state = self.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+        # Statistics for monitoring
+        self._short_circuited = 0
+        self._times_opened = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def _maybe_half_open(self):
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+            self._state = self.HALF_OPEN
+            self._trial_in_flight = False
+
+    def _before_call(self):
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == self.OPEN or (self._state == self.HALF_OPEN and self._trial_in_flight):
+                self._short_circuited += 1
+                raise CircuitOpenError(f"Circuit '{self.name}' is open")
+            if self._state == self.HALF_OPEN:
+                # Let a single trial call through to probe recovery
+                self._trial_in_flight = True
+
+    def _on_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._consecutive_failures = 0
+            self._trial_in_flight = False
+
+    def _on_failure(self):
+        with self._lock:
+            self._consecutive_failures += 1
+            if self._state == self.HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self._times_opened += 1
+                    print(f"Circuit '{self.name}' opened after {self._consecutive_failures} failures")
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._trial_in_flight = False
+
+    def call(self, func: Callable, *args, **kwargs):
+        """Call func through the breaker, raising CircuitOpenError when open"""
+        self._before_call()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            if self.is_failure(e):
+                self._on_failure()
+            else:
+                # The dependency answered, it just rejected this call
+                self._on_success()
+            raise
+        self._on_success()
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get breaker statistics"""
+        state = self.state
+        return {
+            "name": self.name,
+            "state": state,
+            "consecutive_failures": self._consecutive_failures,
+            "times_opened": self._times_opened,
+            "short_circuited_calls": self._short_circuited,
+        }
+
+
+@lru_cache()
+def get_llm_breaker() -> CircuitBreaker:
+    """Breaker shared by every OpenAI chat and embedding client"""
+    settings = get_settings()
+    return CircuitBreaker(
+        name="openai_chat",
+        failure_threshold=settings.breaker_failure_threshold,
+        recovery_timeout=settings.breaker_recovery_seconds,
+        is_failure=is_transient_error,
+    )
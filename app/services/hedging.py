@@ -0,0 +1,247 @@
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Dict, Any, Optional
+import openai
+from app.config import get_settings
+from app.services.circuit_breaker import CircuitBreaker, CircuitOpenError, get_llm_breaker, is_transient_error
+from app.services.profiling import active_profile
+
+
+class LLMDeadlineExceeded(Exception):
+    """Raised when an LLM call cannot finish within its latency budget"""
+
+
+def _percentile(samples: list, pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class HedgedCaller:
+    """
+    Deadline-aware caller for slow, idempotent requests:
+    1. Hedging: if the primary call is slower than the adaptive percentile, send an identical one
+    2. Bounded retries with full jitter for transient errors while budget remains
+    3. Hard deadline: stop waiting when the budget is spent
+    """
+
+    def __init__(
+        self,
+        name: str,
+        breaker: Optional[CircuitBreaker] = None,
+        hedge_percentile: float = 95.0,
+        initial_hedge_delay: float = 2.0,
+        min_samples: int = 20,
+        max_retries: int = 2,
+        backoff_base: float = 0.2,
+        window_size: int = 200,
+        max_workers: int = 16,
+        is_retryable: Callable[[Exception], bool] = is_transient_error,
+    ):
+        self.name = name
+        self.breaker = breaker
+        self.hedge_percentile = hedge_percentile
+        self.initial_hedge_delay = initial_hedge_delay
+        self.min_samples = min_samples
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.is_retryable = is_retryable
+        # Calls can't be cancelled once running: abandoned ones hold a worker until the client times out
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{name}-llm")
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        # Latency of primary calls alone drives the hedge threshold;
+        # latency actually delivered to callers, whatever the outcome, shows what hedging buys us
+        self._primary_latencies = deque(maxlen=window_size)
+        self._effective_latencies = deque(maxlen=window_size)
+        # Statistics for monitoring
+        self._calls = 0
+        self._hedges_sent = 0
+        self._hedges_skipped = 0
+        self._hedge_wins = 0
+        self._retries = 0
+        self._deadline_exceeded = 0
+
+    def hedge_delay(self) -> float:
+        """Seconds to wait on the primary call before hedging"""
+        with self._lock:
+            samples = list(self._primary_latencies)
+        if len(samples) < self.min_samples:
+            return self.initial_hedge_delay
+        return _percentile(samples, self.hedge_percentile)
+
+    def _invoke(self, func: Callable, args: tuple, kwargs: dict):
+        if self.breaker:
+            return self.breaker.call(func, *args, **kwargs)
+        return func(*args, **kwargs)
+
+    def _invoke_profiled(self, profile, func: Callable, args: tuple, kwargs: dict):
+        # Executor threads don't inherit the request's context, so register them explicitly
+        with profile.worker_thread():
+            return self._invoke(func, args, kwargs)
+
+    def _submit(self, func: Callable, args: tuple, kwargs: dict):
+        with self._lock:
+            self._in_flight += 1
+        profile = active_profile()
+        if profile is None:
+            future = self._executor.submit(self._invoke, func, args, kwargs)
+        else:
+            future = self._executor.submit(self._invoke_profiled, profile, func, args, kwargs)
+        future.add_done_callback(self._on_done)
+        return future
+
+    def _on_done(self, future):
+        with self._lock:
+            self._in_flight -= 1
+
+    def _record_primary(self, future, started: float):
+        if future.cancelled():
+            return
+        error = future.exception()
+        # A timed-out call still tells us the provider took at least this long
+        if error is None or isinstance(error, (openai.APITimeoutError, TimeoutError)):
+            with self._lock:
+                self._primary_latencies.append(time.monotonic() - started)
+
+    def _hedged_attempt(self, func: Callable, args: tuple, kwargs: dict, deadline: float):
+        """Run the primary call plus at most one hedge; the first success wins"""
+        started = time.monotonic()
+        delay = self.hedge_delay()
+        primary = self._submit(func, args, kwargs)
+        primary.add_done_callback(lambda f: self._record_primary(f, started))
+
+        pending = {primary}
+        hedged = False
+        error = None
+        while pending:
+            now = time.monotonic()
+            if now >= deadline:
+                raise LLMDeadlineExceeded(f"{self.name} call exceeded its latency budget")
+
+            timeout = deadline - now
+            if not hedged:
+                timeout = min(timeout, max(0.0, started + delay - now))
+
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is not primary:
+                        with self._lock:
+                            self._hedge_wins += 1
+                    return future.result()
+                if future is not primary and isinstance(future.exception(), CircuitOpenError):
+                    # The breaker opened or is probing recovery; the primary may still succeed
+                    continue
+                error = future.exception()
+                if not self.is_retryable(error):
+                    # Deterministic errors (bad request, auth, context length) fail the same way twice
+                    raise error
+
+            if not hedged and primary in pending and time.monotonic() < deadline:
+                hedged = True
+                with self._lock:
+                    # A hedge that would only queue behind busy workers can't win, and while
+                    # the breaker isn't closed it would only be short-circuited
+                    skip = self._in_flight >= self.max_workers or (
+                        self.breaker is not None and self.breaker.state != CircuitBreaker.CLOSED
+                    )
+                    if skip:
+                        self._hedges_skipped += 1
+                    else:
+                        self._hedges_sent += 1
+                if not skip:
+                    pending.add(self._submit(func, args, kwargs))
+
+        raise error
+
+    def call(self, func: Callable, *args, timeout: float, **kwargs):
+        """Call func within timeout seconds, hedging and retrying as needed"""
+        started = time.monotonic()
+        with self._lock:
+            self._calls += 1
+        try:
+            return self._call_with_retries(func, args, kwargs, started + timeout)
+        finally:
+            # Failures and deadline misses are latency the caller waited too
+            with self._lock:
+                self._effective_latencies.append(time.monotonic() - started)
+
+    def _call_with_retries(self, func: Callable, args: tuple, kwargs: dict, deadline: float):
+        last_error = None
+        for attempt in range(self.max_retries + 1):
+            try:
+                return self._hedged_attempt(func, args, kwargs, deadline)
+            except LLMDeadlineExceeded:
+                with self._lock:
+                    self._deadline_exceeded += 1
+                raise
+            except CircuitOpenError:
+                raise
+            except Exception as e:
+                if not self.is_retryable(e):
+                    raise
+                last_error = e
+                backoff = random.uniform(0, self.backoff_base * (2 ** attempt))
+                if attempt == self.max_retries or time.monotonic() + backoff >= deadline:
+                    break
+                with self._lock:
+                    self._retries += 1
+                time.sleep(backoff)
+
+        raise last_error
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hedging and tail-latency statistics"""
+        with self._lock:
+            primary = list(self._primary_latencies)
+            effective = list(self._effective_latencies)
+            calls = self._calls
+            hedges_sent = self._hedges_sent
+            hedges_skipped = self._hedges_skipped
+            in_flight = self._in_flight
+            hedge_wins = self._hedge_wins
+            retries = self._retries
+            deadline_exceeded = self._deadline_exceeded
+
+        primary_p99 = _percentile(primary, 99) * 1000
+        effective_p99 = _percentile(effective, 99) * 1000
+        hedge_rate = (hedges_sent / calls * 100) if calls > 0 else 0
+
+        return {
+            "calls": calls,
+            "hedges_sent": hedges_sent,
+            "hedge_rate": f"{hedge_rate:.1f}%",
+            "hedges_skipped": hedges_skipped,
+            "hedge_wins": hedge_wins,
+            "in_flight": in_flight,
+            "retries": retries,
+            "deadline_exceeded": deadline_exceeded,
+            "hedge_delay_ms": round(self.hedge_delay() * 1000, 1),
+            "primary_p50_ms": round(_percentile(primary, 50) * 1000, 1),
+            "primary_p99_ms": round(primary_p99, 1),
+            "effective_p50_ms": round(_percentile(effective, 50) * 1000, 1),
+            "effective_p99_ms": round(effective_p99, 1),
+            "p99_improvement_ms": round(primary_p99 - effective_p99, 1) if primary and effective else 0.0,
+        }
+
+
+def create_llm_caller(name: str) -> HedgedCaller:
+    """Build a hedged caller for one agent's LLM client from settings"""
+    settings = get_settings()
+    return HedgedCaller(
+        name=name,
+        breaker=get_llm_breaker(),
+        hedge_percentile=settings.llm_hedge_percentile,
+        initial_hedge_delay=settings.llm_initial_hedge_delay_seconds,
+        max_retries=settings.llm_max_retries,
+        backoff_base=settings.llm_retry_backoff_seconds,
+        # A primary and a hedge for every admitted request
+        max_workers=2 * settings.max_concurrent_requests,
+    )
@@ -0,0 +1,180 @@
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import Dict, Any, Optional
+
+# Profile of the request running in the current context; None when profiling is off
+_active_profile: ContextVar[Optional["RequestProfile"]] = ContextVar("active_profile", default=None)
+
+# Shared no-op span so disabled profiling allocates nothing
+_NULL_SPAN = nullcontext()
+
+
+class RequestProfile:
+    """Wall-time breakdown of a single request"""
+
+    def __init__(self):
+        self.profile_id = uuid.uuid4().hex[:12]
+        self.total_seconds = 0.0
+        self.samples = 0
+        self.profile_path: Optional[str] = None
+        self._timings: Dict[str, Dict[str, Dict[str, float]]] = {"nodes": {}, "calls": {}}
+        # Worker threads currently running work for this request (e.g. LLM calls)
+        self._worker_threads = set()
+        self._lock = threading.Lock()
+
+    def record(self, kind: str, name: str, elapsed: float):
+        with self._lock:
+            timing = self._timings[kind].setdefault(name, {"count": 0, "seconds": 0.0})
+            timing["count"] += 1
+            timing["seconds"] += elapsed
+
+    def worker_thread(self) -> "_WorkerThread":
+        """Context manager that adds the current thread to this request's samples"""
+        return _WorkerThread(self)
+
+    def worker_threads(self) -> set:
+        with self._lock:
+            return set(self._worker_threads)
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            breakdown = {
+                kind: {
+                    name: {"count": timing["count"], "wall_ms": round(timing["seconds"] * 1000, 2)}
+                    for name, timing in timings.items()
+                }
+                for kind, timings in self._timings.items()
+            }
+        return {
+            "profile_id": self.profile_id,
+            "total_ms": round(self.total_seconds * 1000, 2),
+            **breakdown,
+            "samples": self.samples,
+            "profile_path": self.profile_path,
+        }
+
+
+class _Span:
+    def __init__(self, profile: RequestProfile, kind: str, name: str):
+        self.profile = profile
+        self.kind = kind
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profile.record(self.kind, self.name, time.perf_counter() - self.started)
+        return False
+
+
+class _WorkerThread:
+    def __init__(self, profile: RequestProfile):
+        self.profile = profile
+
+    def __enter__(self):
+        self.ident = threading.get_ident()
+        with self.profile._lock:
+            self.profile._worker_threads.add(self.ident)
+        return self
+
+    def __exit__(self, *exc):
+        with self.profile._lock:
+            self.profile._worker_threads.discard(self.ident)
+        return False
+
+
+def active_profile() -> Optional[RequestProfile]:
+    """Profile of the current request, if it is being profiled"""
+    return _active_profile.get()
+
+
+def profile_span(name: str, kind: str = "calls"):
+    """Time a graph node ('nodes') or external call ('calls') if the request is being profiled"""
+    profile = _active_profile.get()
+    if profile is None:
+        return _NULL_SPAN
+    return _Span(profile, kind, name)
+
+
+class SamplingProfiler:
+    """
+    Samples the request thread's stack, plus any worker threads registered on the
+    profile, at a fixed interval and aggregates folded stacks
+    """
+
+    def __init__(self, profile: RequestProfile, interval: float = 0.005):
+        self.profile = profile
+        self.interval = interval
+        self._stacks = Counter()
+        self._stop = threading.Event()
+        self._target = None
+        self._thread = None
+
+    def start(self):
+        self._target = threading.get_ident()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            workers = self.profile.worker_threads()
+            names = {thread.ident: thread.name for thread in threading.enumerate()} if workers else {}
+            for ident in {self._target} | workers:
+                frame = frames.get(ident)
+                if frame is None:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                # Root each stack at its thread so request and worker time stay apart
+                thread = "request" if ident == self._target else names.get(ident, "worker").replace(";", "_")
+                stack.append(f"[{thread}]")
+                self._stacks[";".join(reversed(stack))] += 1
+
+    @property
+    def samples(self) -> int:
+        return sum(self._stacks.values())
+
+    def folded(self) -> str:
+        """Stacks in the collapsed format read by flamegraph.pl and speedscope"""
+        return "\n".join(f"{stack} {count}" for stack, count in self._stacks.most_common())
+
+
+@contextmanager
+def profile_request(output_dir: Optional[str] = None, interval: float = 0.005):
+    """Profile the enclosed work, optionally saving a folded-stack profile to output_dir"""
+    profile = RequestProfile()
+    token = _active_profile.set(profile)
+    sampler = SamplingProfiler(profile, interval)
+    sampler.start()
+    started = time.perf_counter()
+    try:
+        yield profile
+    finally:
+        profile.total_seconds = time.perf_counter() - started
+        sampler.stop()
+        _active_profile.reset(token)
+        profile.samples = sampler.samples
+
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+            path = os.path.join(output_dir, f"profile_{profile.profile_id}.folded")
+            with open(path, "w") as f:
+                f.write(sampler.folded())
+            profile.profile_path = path
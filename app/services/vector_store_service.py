@@ -1,39 +1,122 @@
 import os
-from typing import List, Optional
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Any, List, Optional, Tuple
 from langchain_openai import OpenAIEmbeddings
 from langchain_community.vectorstores import FAISS
 from langchain.schema import Document
 from app.config import get_settings
+from app.services.hedging import LLMDeadlineExceeded, create_llm_caller
+from app.services.profiling import profile_span
+
+INDEX_FILES = ("index.faiss", "index.pkl")
+
+
+class CatalogNotFoundError(Exception):
+    """Raised when a catalog has no index on disk"""
+
+
+class _LoadedIndex:
+    def __init__(self, vectorstore: FAISS, key: Tuple[float, int, int]):
+        self.vectorstore = vectorstore
+        # Latest mtime and the size of each index file, as seen when the index was loaded
+        self.key = key
+        self.nbytes = sum(key[1:])
+
 
 class VectorStoreService:
+    """
+    Per-catalog FAISS indexes, loaded lazily on first use and kept in memory
+    within a byte budget using LRU eviction
+    """
+
+    # Loads retried when the index is rewritten while being read
+    MAX_LOAD_ATTEMPTS = 3
+
     def __init__(self):
         self.settings = get_settings()
         self.embeddings = OpenAIEmbeddings(
             model=self.settings.embedding_model,
-            openai_api_key=self.settings.openai_api_key
+            openai_api_key=self.settings.openai_api_key,
+            base_url=self.settings.openai_base_url,
+            # Retries, the breaker and the deadline are handled by the embedding caller
+            timeout=self.settings.request_timeout_seconds,
+            max_retries=0
         )
-        self.vectorstore = None
-        self._load_or_create_vectorstore()
-    
-    def _load_or_create_vectorstore(self):
-        """Load existing vectorstore or create new one"""
-        vector_path = self.settings.vector_store_path
-        
-        if os.path.exists(f"{vector_path}.faiss"):
+        self.embedding_caller = create_llm_caller("embedding")
+        # Recent query embeddings, so repeated queries still retrieve while the provider is down
+        self._embedding_cache: "OrderedDict[str, List[float]]" = OrderedDict()
+        self.max_bytes = self.settings.max_index_memory_mb * 1024 * 1024
+        self._indexes: "OrderedDict[str, _LoadedIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self._change_listeners: List[Callable[[str], None]] = []
+        # Statistics for monitoring
+        self._loads = 0
+        self._load_seconds = 0.0
+        self._last_load_ms: Dict[str, float] = {}
+        self._evictions = 0
+        self._evicted_bytes = 0
+        self._invalidations = 0
+
+    def _catalog_path(self, catalog_id: str) -> str:
+        if catalog_id == self.settings.default_catalog_id:
+            return self.settings.vector_store_path
+        return os.path.join(self.settings.catalogs_dir, catalog_id)
+
+    def _index_key(self, path: str) -> Optional[Tuple[float, int, int]]:
+        """Identify an index version by both files, as save_local writes them one after the other"""
+        try:
+            stats = [os.stat(os.path.join(path, name)) for name in INDEX_FILES]
+        except OSError:
+            return None
+        return (max(stat.st_mtime for stat in stats), *(stat.st_size for stat in stats))
+
+    def _load_lock(self, catalog_id: str) -> threading.Lock:
+        with self._lock:
+            return self._load_locks.setdefault(catalog_id, threading.Lock())
+
+    def catalog_exists(self, catalog_id: Optional[str] = None) -> bool:
+        """Whether a catalog can be served (the default catalog is created on demand)"""
+        catalog_id = catalog_id or self.settings.default_catalog_id
+        if catalog_id == self.settings.default_catalog_id:
+            return True
+        return self._index_key(self._catalog_path(catalog_id)) is not None
+
+    def add_change_listener(self, listener: Callable[[str], None]):
+        """Register a callback invoked with the catalog id whenever its index changes"""
+        self._change_listeners.append(listener)
+
+    def _notify_change(self, catalog_id: str):
+        with self._lock:
+            self._invalidations += 1
+        for listener in self._change_listeners:
+            listener(catalog_id)
+
+    def _load_or_create_vectorstore(self, catalog_id: str) -> FAISS:
+        """Load a catalog's vectorstore, creating the sample one for the default catalog"""
+        vector_path = self._catalog_path(catalog_id)
+
+        if self._index_key(vector_path) is not None:
             try:
-                self.vectorstore = FAISS.load_local(
-                    vector_path, 
+                vectorstore = FAISS.load_local(
+                    vector_path,
                     self.embeddings,
                     allow_dangerous_deserialization=True
                 )
-                print("Loaded existing vector store")
+                print(f"Loaded existing vector store for catalog '{catalog_id}'")
+                return vectorstore
             except Exception as e:
-                print(f"Failed to load vector store: {e}")
-                self._create_default_vectorstore()
-        else:
-            self._create_default_vectorstore()
-    
-    def _create_default_vectorstore(self):
+                print(f"Failed to load vector store for catalog '{catalog_id}': {e}")
+                if catalog_id != self.settings.default_catalog_id:
+                    raise
+        elif catalog_id != self.settings.default_catalog_id:
+            raise CatalogNotFoundError(f"Unknown catalog '{catalog_id}'")
+
+        return self._create_default_vectorstore()
+
+    def _create_default_vectorstore(self) -> FAISS:
         """Create vectorstore with sample product data"""
         sample_products = [
             "Nike Air Max 270 sneakers, size 42, black/white colorway, $120, breathable mesh upper",
@@ -47,29 +130,149 @@ class VectorStoreService:
             "ASICS Gel-Kayano 29, size 41, blue/silver, $160, stability running shoe",
             "Skechers Go Walk 6, size 39, black, $80, ultra-lightweight walking shoe"
         ]
-        
-        documents = [Document(page_content=text, metadata={"source": f"product_{i}"}) 
+
+        documents = [Document(page_content=text, metadata={"source": f"product_{i}"})
                     for i, text in enumerate(sample_products)]
-        
-        self.vectorstore = FAISS.from_documents(documents, self.embeddings)
-        
+
+        vectorstore = FAISS.from_documents(documents, self.embeddings)
+
         # Save the vectorstore
-        os.makedirs(os.path.dirname(self.settings.vector_store_path), exist_ok=True)
-        self.vectorstore.save_local(self.settings.vector_store_path)
+        os.makedirs(self.settings.vector_store_path, exist_ok=True)
+        vectorstore.save_local(self.settings.vector_store_path)
         print("Created and saved new vector store with sample products")
-    
-    def similarity_search(self, query: str, k: Optional[int] = None) -> List[Document]:
-        """Perform similarity search"""
-        if not self.vectorstore:
-            raise ValueError("Vector store not initialized")
-        
+        return vectorstore
+
+    def _evict(self, keep: str):
+        """Drop least recently used indexes until the byte budget is met (caller holds the lock)"""
+        total = sum(index.nbytes for index in self._indexes.values())
+        for catalog_id in list(self._indexes):
+            if total <= self.max_bytes:
+                break
+            if catalog_id == keep:
+                continue
+            evicted = self._indexes.pop(catalog_id)
+            total -= evicted.nbytes
+            self._evictions += 1
+            self._evicted_bytes += evicted.nbytes
+            print(f"Evicted vector store for catalog '{catalog_id}' ({evicted.nbytes} bytes)")
+
+    def get_vectorstore(self, catalog_id: Optional[str] = None) -> FAISS:
+        """Get a catalog's vectorstore, loading it on first use or when its index changed"""
+        catalog_id = catalog_id or self.settings.default_catalog_id
+        path = self._catalog_path(catalog_id)
+        key = self._index_key(path)
+
+        with self._lock:
+            loaded = self._indexes.get(catalog_id)
+            if loaded is not None and loaded.key == key:
+                self._indexes.move_to_end(catalog_id)
+                return loaded.vectorstore
+
+        # Load outside the shared lock so other catalogs keep serving
+        with self._load_lock(catalog_id):
+            key = self._index_key(path)
+            with self._lock:
+                current = self._indexes.get(catalog_id)
+                if current is not None and current.key == key:
+                    # Loaded or written by another thread while we waited
+                    self._indexes.move_to_end(catalog_id)
+                    return current.vectorstore
+
+            started = time.perf_counter()
+            for _ in range(self.MAX_LOAD_ATTEMPTS):
+                before = key
+                vectorstore = self._load_or_create_vectorstore(catalog_id)
+                key = self._index_key(path)
+                # Retry if the index was rewritten mid-load; no key before means we just created it
+                if before is None or key == before:
+                    break
+            elapsed = time.perf_counter() - started
+
+            with self._lock:
+                self._loads += 1
+                self._load_seconds += elapsed
+                self._last_load_ms[catalog_id] = round(elapsed * 1000, 1)
+                # Keyed on the version read before loading, so a still-changing index reloads next time
+                self._indexes[catalog_id] = _LoadedIndex(vectorstore, before or key)
+                self._indexes.move_to_end(catalog_id)
+                self._evict(keep=catalog_id)
+
+        if loaded is not None:
+            # Index on disk changed under a loaded copy
+            self._notify_change(catalog_id)
+        return vectorstore
+
+    def _embed_query(self, query: str, deadline: Optional[float] = None) -> List[float]:
+        """Embed a query through the LLM breaker, within the request's remaining deadline"""
+        with self._lock:
+            cached = self._embedding_cache.get(query)
+            if cached is not None:
+                self._embedding_cache.move_to_end(query)
+                return cached
+
+        if deadline is None:
+            budget = self.settings.request_timeout_seconds
+        else:
+            budget = deadline - time.monotonic()
+        if budget <= 0:
+            raise LLMDeadlineExceeded("No time left to embed the query")
+
+        embedding = self.embedding_caller.call(self.embeddings.embed_query, query, timeout=budget)
+        with self._lock:
+            self._embedding_cache[query] = embedding
+            if len(self._embedding_cache) > self.settings.embedding_cache_size:
+                self._embedding_cache.popitem(last=False)
+        return embedding
+
+    def similarity_search(
+        self,
+        query: str,
+        k: Optional[int] = None,
+        catalog_id: Optional[str] = None,
+        deadline: Optional[float] = None
+    ) -> List[Document]:
+        """Perform similarity search within a catalog"""
+        vectorstore = self.get_vectorstore(catalog_id)
+
         k = k or self.settings.top_k
-        return self.vectorstore.similarity_search(query, k=k)
-    
-    def add_documents(self, documents: List[Document]):
-        """Add new documents to the vector store"""
-        if not self.vectorstore:
-            self._create_default_vectorstore()
-        
-        self.vectorstore.add_documents(documents)
-        self.vectorstore.save_local(self.settings.vector_store_path)
\ No newline at end of file
+        # Embed and search separately so profiles can tell the two apart
+        with profile_span("embedding"):
+            embedding = self._embed_query(query, deadline)
+        with profile_span("faiss_search"):
+            return vectorstore.similarity_search_by_vector(embedding, k=k)
+
+    def add_documents(self, documents: List[Document], catalog_id: Optional[str] = None):
+        """Add new documents to a catalog's vector store"""
+        catalog_id = catalog_id or self.settings.default_catalog_id
+        path = self._catalog_path(catalog_id)
+
+        if self._index_key(path) is None and catalog_id != self.settings.default_catalog_id:
+            # First documents of a new catalog
+            vectorstore = FAISS.from_documents(documents, self.embeddings)
+        else:
+            vectorstore = self.get_vectorstore(catalog_id)
+            vectorstore.add_documents(documents)
+
+        # Hold the load lock so a concurrent get_vectorstore doesn't reload our own write
+        with self._load_lock(catalog_id):
+            vectorstore.save_local(path)
+            with self._lock:
+                self._indexes[catalog_id] = _LoadedIndex(vectorstore, self._index_key(path))
+                self._indexes.move_to_end(catalog_id)
+                self._evict(keep=catalog_id)
+        self._notify_change(catalog_id)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get index memory, load time and eviction statistics"""
+        with self._lock:
+            return {
+                "loaded_catalogs": list(self._indexes),
+                "bytes_in_memory": sum(index.nbytes for index in self._indexes.values()),
+                "max_bytes": self.max_bytes,
+                "loads": self._loads,
+                "avg_load_ms": round(self._load_seconds / self._loads * 1000, 1) if self._loads else 0.0,
+                "last_load_ms": dict(self._last_load_ms),
+                "evictions": self._evictions,
+                "evicted_bytes": self._evicted_bytes,
+                "invalidations": self._invalidations,
+            }
@@ -0,0 +1,53 @@
+import asyncio
+import time
+import pytest
+from app.services.admission import AdmissionController, AdmissionRejected, TokenBucketRateLimiter
+
+class TestAdmissionController:
+    
+    @pytest.mark.asyncio
+    async def test_rejects_expired_deadline(self):
+        controller = AdmissionController(max_concurrency=1, max_queue_size=1)
+        
+        with pytest.raises(AdmissionRejected) as exc_info:
+            async with controller.slot(time.monotonic() - 1):
+                pass
+        
+        assert exc_info.value.status_code == 503
+        assert controller.get_stats()["rejected_deadline"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_sheds_when_queue_full(self):
+        controller = AdmissionController(max_concurrency=1, max_queue_size=0)
+        deadline = time.monotonic() + 5
+        
+        async with controller.slot(deadline):
+            with pytest.raises(AdmissionRejected):
+                async with controller.slot(deadline):
+                    pass
+        
+        stats = controller.get_stats()
+        assert stats["admitted"] == 1
+        assert stats["rejected_queue_full"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_queued_request_times_out_at_deadline(self):
+        controller = AdmissionController(max_concurrency=1, max_queue_size=1)
+        
+        async with controller.slot(time.monotonic() + 5):
+            with pytest.raises(AdmissionRejected):
+                async with controller.slot(time.monotonic() + 0.05):
+                    pass
+        
+        assert controller.get_stats()["queue_depth"] == 0
+
+class TestTokenBucketRateLimiter:
+    
+    def test_burst_then_refill(self):
+        limiter = TokenBucketRateLimiter(rate_per_second=1.0, burst=2)
+        
+        assert limiter.allow("user", now=0.0)
+        assert limiter.allow("user", now=0.0)
+        assert not limiter.allow("user", now=0.0)
+        assert limiter.allow("other_user", now=0.0)
+        assert limiter.allow("user", now=1.0)
@@ -85,3 +85,33 @@ class TestAPI:
         response = test_client.post("/api/query", json=payload)
         assert response.status_code == 500
         assert "Query processing failed" in response.json()["detail"]
+    
+    @patch('app.agents.workflow.MultiAgentWorkflow.process_query')
+    def test_query_endpoint_rate_limited(self, mock_process, test_client):
+        """Test per-user rate limiting returns 429"""
+        from app.services.admission import TokenBucketRateLimiter
+        
+        mock_process.return_value = {
+            "answer": "ok",
+            "confidence_score": 0.9,
+            "retrieved_docs": [],
+            "processing_successful": True
+        }
+        limiter = TokenBucketRateLimiter(rate_per_second=0.0, burst=1)
+        
+        with patch('app.routers.query.get_rate_limiter', return_value=limiter):
+            payload = {"user_id": "limited_user", "query": "price of Vans"}
+            assert test_client.post("/api/query", json=payload).status_code == 200
+            response = test_client.post("/api/query", json=payload)
+        
+        assert response.status_code == 429
+    
+    def test_metrics_endpoint(self, test_client):
+        """Test metrics expose queue depth, rejections and breaker state"""
+        response = test_client.get("/api/metrics")
+        assert response.status_code == 200
+        
+        data = response.json()
+        assert "queue_depth" in data["admission"]
+        assert "rejected" in data["rate_limiter"]
+        assert data["llm_circuit_breaker"]["state"] in ("closed", "open", "half_open")
@@ -0,0 +1,83 @@
+import time
+import pytest
+from unittest.mock import Mock, patch
+from app.services.circuit_breaker import CircuitBreaker, CircuitOpenError, is_transient_error
+
+class TestCircuitBreaker:
+    
+    def test_opens_after_failures_and_recovers(self):
+        breaker = CircuitBreaker("test", failure_threshold=2, recovery_timeout=0.05)
+        failing = Mock(side_effect=RuntimeError("boom"))
+        
+        for _ in range(2):
+            with pytest.raises(RuntimeError):
+                breaker.call(failing)
+        
+        assert breaker.state == CircuitBreaker.OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.call(failing)
+        assert failing.call_count == 2
+        
+        time.sleep(0.06)
+        assert breaker.call(lambda: "ok") == "ok"
+        assert breaker.state == CircuitBreaker.CLOSED
+    
+    def test_client_errors_do_not_open_circuit(self):
+        import httpx
+        import openai
+        
+        request = httpx.Request("POST", "http://test/v1/chat/completions")
+        bad_request = openai.BadRequestError(
+            "context length exceeded",
+            response=httpx.Response(400, request=request),
+            body=None
+        )
+        server_error = openai.InternalServerError(
+            "overloaded",
+            response=httpx.Response(503, request=request),
+            body=None
+        )
+        breaker = CircuitBreaker("test", failure_threshold=2, recovery_timeout=60, is_failure=is_transient_error)
+        
+        for _ in range(3):
+            with pytest.raises(openai.BadRequestError):
+                breaker.call(Mock(side_effect=bad_request))
+        assert breaker.state == CircuitBreaker.CLOSED
+        
+        for _ in range(2):
+            with pytest.raises(openai.InternalServerError):
+                breaker.call(Mock(side_effect=server_error))
+        assert breaker.state == CircuitBreaker.OPEN
+
+class TestDegradedResponder:
+    
+    def test_extractive_answer_when_circuit_open(self):
+        from app.agents.responder import ResponderAgent
+        
+        with patch('app.agents.responder.ChatOpenAI'):
+            responder = ResponderAgent()
+        responder.llm_caller.breaker = CircuitBreaker("test", failure_threshold=1, recovery_timeout=60)
+        responder.llm_caller.breaker._on_failure()
+        
+        state = {
+            "query": "Vans price",
+            "context": "Document 1: Vans Old Skool sneakers, $60",
+            "retrieved_docs": [{"content": "Vans Old Skool sneakers, $60"}],
+        }
+        result = responder.execute(state)
+        
+        assert result["processing_successful"]
+        assert result["answer_source"] == "extractive"
+        assert "Vans Old Skool" in result["answer"]
+    
+    def test_degraded_source_reaches_workflow_result(self):
+        from app.agents.workflow import MultiAgentWorkflow
+        
+        workflow = MultiAgentWorkflow()
+        workflow.responder_agent.llm_caller.breaker = CircuitBreaker("test", failure_threshold=1, recovery_timeout=60)
+        workflow.responder_agent.llm_caller.breaker._on_failure()
+        
+        result = workflow.process_query("degraded_user", "hello")
+        
+        assert result["processing_successful"]
+        assert result["answer_source"] == "fallback"
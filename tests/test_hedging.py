@@ -0,0 +1,222 @@
+import json
+import threading
+import time
+import openai
+import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import Mock
+from langchain_openai import ChatOpenAI
+from langchain.schema import HumanMessage
+from app.services.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.services.hedging import HedgedCaller, LLMDeadlineExceeded
+
+class FakeLLMServer:
+    """Local OpenAI-compatible chat server with injected per-request latency"""
+    
+    def __init__(self):
+        self.latencies = []
+        self.status = 200
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        # Don't wait for deliberately stuck requests on shutdown
+        self._server.block_on_close = False
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+    
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}/v1"
+    
+    def _next_latency(self) -> float:
+        with self._lock:
+            self.requests += 1
+            return self.latencies.pop(0) if self.latencies else 0.0
+    
+    def _handler(self):
+        server = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                time.sleep(server._next_latency())
+                body = json.dumps({
+                    "id": "chatcmpl-test",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": "gpt-3.5-turbo",
+                    "choices": [{
+                        "index": 0,
+                        "message": {"role": "assistant", "content": "PRODUCT"},
+                        "finish_reason": "stop"
+                    }],
+                    "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2}
+                }).encode()
+                try:
+                    self.send_response(server.status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+            
+            def log_message(self, *args):
+                pass
+        
+        return Handler
+    
+    def __enter__(self):
+        self._thread.start()
+        return self
+    
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+@pytest.fixture
+def fake_llm_server():
+    with FakeLLMServer() as server:
+        yield server
+
+@pytest.fixture
+def llm(fake_llm_server):
+    return ChatOpenAI(
+        model="gpt-3.5-turbo",
+        openai_api_key="test-key",
+        base_url=fake_llm_server.base_url,
+        max_retries=0
+    )
+
+class TestHedgedCaller:
+    
+    def test_hedge_beats_slow_primary(self, fake_llm_server, llm):
+        # Primary is stuck; the hedge answers immediately
+        fake_llm_server.latencies = [2.0, 0.0]
+        caller = HedgedCaller("test", initial_hedge_delay=0.1, max_retries=0)
+        
+        started = time.monotonic()
+        response = caller.call(llm.invoke, [HumanMessage(content="hi")], timeout=5.0)
+        elapsed = time.monotonic() - started
+        
+        assert response.content == "PRODUCT"
+        assert elapsed < 1.5
+        stats = caller.get_stats()
+        assert stats["hedges_sent"] == 1
+        assert stats["hedge_wins"] == 1
+    
+    def test_fast_call_is_not_hedged(self, fake_llm_server, llm):
+        caller = HedgedCaller("test", initial_hedge_delay=1.0, max_retries=0)
+        
+        caller.call(llm.invoke, [HumanMessage(content="hi")], timeout=5.0)
+        
+        assert fake_llm_server.requests == 1
+        assert caller.get_stats()["hedges_sent"] == 0
+    
+    def test_deadline_exceeded(self, fake_llm_server, llm):
+        fake_llm_server.latencies = [1.0, 1.0]
+        caller = HedgedCaller("test", initial_hedge_delay=0.05, max_retries=0)
+        
+        with pytest.raises(LLMDeadlineExceeded):
+            caller.call(llm.invoke, [HumanMessage(content="hi")], timeout=0.2)
+        
+        assert caller.get_stats()["deadline_exceeded"] == 1
+    
+    def test_failed_calls_count_towards_delivered_latency(self):
+        caller = HedgedCaller("test", initial_hedge_delay=5.0, max_retries=0)
+        caller.call(lambda: "ok", timeout=1.0)
+        
+        with pytest.raises(LLMDeadlineExceeded):
+            caller.call(time.sleep, 0.5, timeout=0.2)
+        with pytest.raises(ValueError):
+            caller.call(Mock(side_effect=ValueError("bad request")), timeout=1.0)
+        
+        stats = caller.get_stats()
+        # The caller waited out the whole budget, which hedging did not save
+        assert stats["effective_p99_ms"] >= 200
+        assert stats["p99_improvement_ms"] <= 0
+    
+    def test_abandoned_calls_do_not_block_next_call(self, fake_llm_server):
+        # Primary and hedge both get stuck; the client timeout must free their workers
+        fake_llm_server.latencies = [5.0, 5.0]
+        llm = ChatOpenAI(
+            model="gpt-3.5-turbo",
+            openai_api_key="test-key",
+            base_url=fake_llm_server.base_url,
+            timeout=0.5,
+            max_retries=0
+        )
+        caller = HedgedCaller("test", initial_hedge_delay=0.05, max_retries=0, max_workers=2)
+        
+        with pytest.raises(LLMDeadlineExceeded):
+            caller.call(llm.invoke, [HumanMessage(content="hi")], timeout=0.2)
+        assert caller.get_stats()["hedges_sent"] == 1
+        
+        response = caller.call(llm.invoke, [HumanMessage(content="hi")], timeout=2.0)
+        
+        assert response.content == "PRODUCT"
+        stats = caller.get_stats()
+        assert stats["hedges_skipped"] == 1
+        assert stats["primary_p99_ms"] >= 500
+    
+    def test_hedge_delay_adapts_to_observed_latency(self):
+        caller = HedgedCaller("test", hedge_percentile=90.0, initial_hedge_delay=5.0, min_samples=10)
+        
+        for _ in range(10):
+            caller.call(lambda: "ok", timeout=1.0)
+        
+        assert caller.hedge_delay() < 5.0
+    
+    def test_retries_transient_failures(self):
+        func = Mock(side_effect=[ConnectionError("reset"), "ok"])
+        caller = HedgedCaller("test", max_retries=2, backoff_base=0.01)
+        
+        assert caller.call(func, timeout=1.0) == "ok"
+        assert caller.get_stats()["retries"] == 1
+    
+    def test_client_errors_are_not_retried(self, fake_llm_server, llm):
+        fake_llm_server.status = 400
+        caller = HedgedCaller("test", max_retries=2, backoff_base=0.01)
+        
+        with pytest.raises(openai.BadRequestError):
+            caller.call(llm.invoke, [HumanMessage(content="hi")], timeout=2.0)
+        
+        assert fake_llm_server.requests == 1
+        assert caller.get_stats()["retries"] == 0
+    
+    def test_server_errors_are_retried(self, fake_llm_server, llm):
+        fake_llm_server.status = 503
+        caller = HedgedCaller("test", max_retries=2, backoff_base=0.01)
+        
+        with pytest.raises(openai.InternalServerError):
+            caller.call(llm.invoke, [HumanMessage(content="hi")], timeout=2.0)
+        
+        assert fake_llm_server.requests == 3
+    
+    def test_hedge_does_not_abandon_half_open_trial(self):
+        breaker = CircuitBreaker("test", failure_threshold=1, recovery_timeout=0.0)
+        breaker._on_failure()
+        caller = HedgedCaller("test", breaker=breaker, initial_hedge_delay=0.05, max_retries=0)
+        
+        # The slow primary is the breaker's single trial call
+        assert caller.call(lambda: time.sleep(0.3) or "ok", timeout=2.0) == "ok"
+        assert breaker.state == CircuitBreaker.CLOSED
+        assert caller.get_stats()["hedges_skipped"] == 1
+    
+    def test_short_circuited_hedge_keeps_waiting_on_primary(self):
+        breaker = CircuitBreaker("test", failure_threshold=1, recovery_timeout=60)
+        # The breaker opens after the hedge is sent, e.g. because of another request's failure
+        breaker._before_call = Mock(side_effect=[None, CircuitOpenError("open")])
+        caller = HedgedCaller("test", breaker=breaker, initial_hedge_delay=0.05, max_retries=0)
+        
+        assert caller.call(lambda: time.sleep(0.3) or "ok", timeout=2.0) == "ok"
+        assert caller.get_stats()["hedges_sent"] == 1
+    
+    def test_open_circuit_is_not_retried(self):
+        breaker = CircuitBreaker("test", failure_threshold=1, recovery_timeout=60)
+        breaker._on_failure()
+        func = Mock(return_value="ok")
+        caller = HedgedCaller("test", breaker=breaker, max_retries=2)
+        
+        with pytest.raises(CircuitOpenError):
+            caller.call(func, timeout=1.0)
+        func.assert_not_called()
@@ -0,0 +1,61 @@
+import os
+from unittest.mock import MagicMock, patch
+from app.services.profiling import profile_request, profile_span, _NULL_SPAN
+
+class TestProfiling:
+    
+    def test_span_is_noop_without_active_profile(self):
+        assert profile_span("embedding") is _NULL_SPAN
+    
+    def test_profile_request_records_spans_and_saves_profile(self, tmp_path):
+        with profile_request(str(tmp_path), interval=0.001) as profile:
+            with profile_span("retriever", "nodes"):
+                with profile_span("faiss_search"):
+                    sum(range(200000))
+        
+        data = profile.to_dict()
+        assert data["nodes"]["retriever"]["count"] == 1
+        assert data["calls"]["faiss_search"]["wall_ms"] <= data["nodes"]["retriever"]["wall_ms"]
+        assert os.path.exists(data["profile_path"])
+        assert profile_span("embedding") is _NULL_SPAN
+    
+    def test_samples_hedged_llm_worker_threads(self, tmp_path):
+        import time
+        from app.services.hedging import HedgedCaller
+        
+        def slow_generation():
+            time.sleep(0.2)
+            return "ok"
+        
+        caller = HedgedCaller("test", initial_hedge_delay=5.0, max_retries=0)
+        with profile_request(str(tmp_path), interval=0.002) as profile:
+            caller.call(slow_generation, timeout=2.0)
+        
+        with open(profile.profile_path) as f:
+            folded = f.read()
+        assert "slow_generation" in folded
+        assert "[request]" in folded
+        assert profile.worker_threads() == set()
+    
+    def test_workflow_node_breakdown(self):
+        from app.agents.workflow import MultiAgentWorkflow
+        
+        workflow = MultiAgentWorkflow()
+        workflow.retriever_agent.vector_service.embeddings = MagicMock()
+        workflow.retriever_agent.vector_service.embeddings.embed_query.return_value = [0.0] * 1536
+        workflow.responder_agent.llm = MagicMock()
+        workflow.responder_agent.llm.invoke.return_value = MagicMock(content="We have Vans.")
+        
+        result = workflow.process_query("profile_user", "Which Vans do you stock?", profile=True)
+        
+        profile = result["profile"]
+        assert {"router", "retriever", "template", "responder"} <= set(profile["nodes"])
+        assert {"heuristics", "embedding", "faiss_search", "context_build", "generation"} <= set(profile["calls"])
+        assert "profile" not in workflow.process_query("profile_user", "Which Vans do you stock?")
+    
+    def test_profiling_disabled_by_config(self, test_client):
+        response = test_client.post(
+            "/api/query?profile=true",
+            json={"user_id": "test_user", "query": "price of Vans"}
+        )
+        assert response.status_code == 403
@@ -0,0 +1,92 @@
+import pytest
+from unittest.mock import MagicMock
+from langchain.schema import Document
+from app.agents.template_answer import TemplateAnswerAgent
+
+def _docs(*contents):
+    return [{"content": content, "metadata": {}, "relevance_score": 0.0} for content in contents]
+
+VANS = "Vans Old Skool sneakers, size 43, black/white, $60, durable suede and canvas upper"
+JORDAN = "Jordan 1 Retro High, size 44, bred colorway, $170, premium leather construction"
+CONVERSE = "Converse Chuck Taylor All Star, size 39, red canvas, $65, classic high-top design"
+NEW_BALANCE = "New Balance 990v5, size 40, grey, $175, premium made in USA construction"
+PUMA = "Puma RS-X sneakers, size 42, white/black/red, $110, retro-inspired chunky sole"
+NIKE = "Nike Air Max 270 sneakers, size 42, black/white colorway, $120, breathable mesh upper"
+
+class TestTemplateAnswerAgent:
+    
+    @pytest.fixture
+    def agent(self):
+        return TemplateAnswerAgent()
+    
+    def test_price_question(self, agent):
+        result = agent.execute({"query": "price of the Vans Old Skool", "retrieved_docs": _docs(VANS, NIKE)})
+        
+        assert result["answer"] == "The Vans Old Skool costs $60."
+        assert result["answer_source"] == "template"
+    
+    def test_size_question(self, agent):
+        result = agent.execute({"query": "what sizes do you have for Jordan 1", "retrieved_docs": _docs(JORDAN, NIKE)})
+        
+        assert result["answer"] == "The Jordan 1 Retro High is available in size 44."
+    
+    def test_color_availability_question(self, agent):
+        result = agent.execute({"query": "is the Puma RS-X available in white", "retrieved_docs": _docs(PUMA)})
+        assert result["answer"].startswith("Yes, the Puma RS-X is available in white/black/red")
+        
+        result = agent.execute({"query": "is the Puma RS-X available in green", "retrieved_docs": _docs(PUMA)})
+        assert result["answer"].startswith("Sorry")
+    
+    def test_color_synonyms_match(self, agent):
+        result = agent.execute({"query": "is the New Balance 990v5 available in gray", "retrieved_docs": _docs(NEW_BALANCE)})
+        
+        assert result["answer"] == "Yes, the New Balance 990v5 is available in grey."
+    
+    def test_falls_back_when_colorway_is_not_plain_colors(self, agent):
+        # "bred" is black and red; "red canvas" names a material
+        for query, docs in [
+            ("is the Jordan 1 available in red", _docs(JORDAN)),
+            ("is the Jordan 1 available in black", _docs(JORDAN)),
+            ("is the Converse Chuck Taylor available in blue canvas", _docs(CONVERSE)),
+        ]:
+            assert agent.execute({"query": query, "retrieved_docs": docs}) == {}
+    
+    def test_falls_back_when_product_not_named(self, agent):
+        assert agent.execute({"query": "price of Nike shoes", "retrieved_docs": _docs(NIKE, VANS)}) == {}
+    
+    def test_falls_back_for_other_model(self, agent):
+        assert agent.execute({"query": "is the new balance 574 in stock", "retrieved_docs": _docs(NEW_BALANCE)}) == {}
+    
+    def test_size_answers_only_compare_same_scale(self, agent):
+        query = "Do you have the Converse Chuck Taylor in size 9?"
+        assert agent.execute({"query": query, "retrieved_docs": _docs(CONVERSE)}) == {}
+        
+        result = agent.execute({"query": "Do you have the Converse Chuck Taylor in size 42?", "retrieved_docs": _docs(CONVERSE)})
+        assert result["answer"].startswith("Sorry")
+    
+    def test_falls_back_for_off_topic_or_comparisons(self, agent):
+        assert agent.execute({"query": "cost of shipping for the Vans Old Skool", "retrieved_docs": _docs(VANS)}) == {}
+        assert agent.execute({"query": "is the Vans Old Skool cheaper than $50", "retrieved_docs": _docs(VANS)}) == {}
+        assert agent.execute({"query": "is the Puma RS-X available in black or green", "retrieved_docs": _docs(PUMA)}) == {}
+    
+    def test_falls_back_for_open_questions(self, agent):
+        assert agent.execute({"query": "is the Vans Old Skool good for skating", "retrieved_docs": _docs(VANS)}) == {}
+        assert agent.execute({"query": "price and sizes of the Vans Old Skool", "retrieved_docs": _docs(VANS)}) == {}
+
+class TestTemplateTier:
+    
+    def test_template_answer_skips_llm(self):
+        from app.agents.workflow import MultiAgentWorkflow
+        
+        workflow = MultiAgentWorkflow()
+        workflow.retriever_agent.vector_service.similarity_search = MagicMock(return_value=[
+            Document(page_content=VANS, metadata={"source": "product_3"})
+        ])
+        workflow.responder_agent.llm = MagicMock()
+        
+        result = workflow.process_query("template_user", "price of the Vans Old Skool")
+        
+        assert result["answer"] == "The Vans Old Skool costs $60."
+        assert result["answer_source"] == "template"
+        workflow.responder_agent.llm.invoke.assert_not_called()
+        assert workflow.get_tier_stats()["template"]["count"] == 1
@@ -0,0 +1,177 @@
+import os
+import threading
+import time
+import pytest
+from unittest.mock import Mock, patch
+from langchain_community.embeddings import DeterministicFakeEmbedding
+from langchain_community.vectorstores import FAISS
+from langchain.schema import Document
+from app.config import get_settings
+from app.services.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.services.hedging import LLMDeadlineExceeded
+from app.services.vector_store_service import CatalogNotFoundError, VectorStoreService
+
+class TestMultiCatalogVectorStore:
+    
+    @pytest.fixture
+    def embeddings(self):
+        return DeterministicFakeEmbedding(size=8)
+    
+    @pytest.fixture
+    def catalogs_dir(self, tmp_path, embeddings):
+        for catalog_id in ("shoes", "bags", "hats"):
+            texts = [f"{catalog_id} product {i}" for i in range(20)]
+            FAISS.from_texts(texts, embeddings).save_local(str(tmp_path / catalog_id))
+        return tmp_path
+    
+    @pytest.fixture
+    def service(self, catalogs_dir, embeddings):
+        settings = get_settings().model_copy(update={"catalogs_dir": str(catalogs_dir)})
+        with patch('app.services.vector_store_service.get_settings', return_value=settings):
+            service = VectorStoreService()
+        service.embeddings = embeddings
+        return service
+    
+    def test_loads_catalogs_lazily(self, service):
+        assert service.get_stats()["loads"] == 0
+        
+        docs = service.similarity_search("bags product 3", k=1, catalog_id="bags")
+        
+        assert docs[0].page_content.startswith("bags")
+        stats = service.get_stats()
+        assert stats["loaded_catalogs"] == ["bags"]
+        assert stats["loads"] == 1
+        assert "bags" in stats["last_load_ms"]
+    
+    def test_evicts_least_recently_used_by_bytes(self, service):
+        service.get_vectorstore("shoes")
+        index_bytes = service.get_stats()["bytes_in_memory"]
+        service.max_bytes = int(index_bytes * 2.5)
+        
+        service.get_vectorstore("bags")
+        service.get_vectorstore("shoes")
+        service.get_vectorstore("hats")
+        
+        stats = service.get_stats()
+        assert stats["loaded_catalogs"] == ["shoes", "hats"]
+        assert stats["evictions"] == 1
+        assert stats["bytes_in_memory"] <= service.max_bytes
+    
+    def test_unknown_catalog(self, service):
+        assert not service.catalog_exists("missing")
+        with pytest.raises(CatalogNotFoundError):
+            service.similarity_search("anything", catalog_id="missing")
+    
+    def test_reloads_index_changed_on_disk(self, service, catalogs_dir, embeddings):
+        listener = Mock()
+        service.add_change_listener(listener)
+        service.similarity_search("shoes product 1", k=1, catalog_id="shoes")
+        
+        # Another process rebuilds the catalog
+        path = str(catalogs_dir / "shoes")
+        FAISS.from_texts(["shoes restocked item"], embeddings).save_local(path)
+        stat = os.stat(os.path.join(path, "index.faiss"))
+        os.utime(os.path.join(path, "index.faiss"), ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        
+        docs = service.similarity_search("shoes product 1", k=1, catalog_id="shoes")
+        
+        assert docs[0].page_content == "shoes restocked item"
+        listener.assert_called_once_with("shoes")
+        stats = service.get_stats()
+        assert stats["loads"] == 2
+        assert stats["invalidations"] == 1
+    
+    def test_retries_load_when_index_rewritten_mid_load(self, service, catalogs_dir, embeddings):
+        path = str(catalogs_dir / "shoes")
+        load = service._load_or_create_vectorstore
+        
+        def load_during_rewrite(catalog_id):
+            vectorstore = load(catalog_id)
+            if not rewrites:
+                # A writer replaces both files while the first load is reading them
+                rewrites.append(catalog_id)
+                FAISS.from_texts(["shoes restocked item"], embeddings).save_local(path)
+                stat = os.stat(os.path.join(path, "index.pkl"))
+                os.utime(os.path.join(path, "index.pkl"), ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+            return vectorstore
+        
+        rewrites = []
+        service._load_or_create_vectorstore = Mock(side_effect=load_during_rewrite)
+        
+        docs = service.similarity_search("shoes product 1", k=1, catalog_id="shoes")
+        
+        assert docs[0].page_content == "shoes restocked item"
+        assert service._load_or_create_vectorstore.call_count == 2
+        service.get_vectorstore("shoes")
+        assert service._load_or_create_vectorstore.call_count == 2
+    
+    def test_index_change_notifies_listeners(self, service):
+        listener = Mock()
+        service.add_change_listener(listener)
+        service.get_vectorstore("shoes")
+        
+        service.add_documents([Document(page_content="shoes product new")], catalog_id="shoes")
+        
+        listener.assert_called_once_with("shoes")
+        assert service.get_stats()["invalidations"] == 1
+    
+    def test_concurrent_read_does_not_reload_own_write(self, service):
+        listener = Mock()
+        service.add_change_listener(listener)
+        vectorstore = service.get_vectorstore("shoes")
+        save_local = vectorstore.save_local
+        readers = []
+        
+        def save_and_read(path):
+            save_local(path)
+            # A request sees the new files before add_documents has recorded them
+            reader = threading.Thread(target=service.get_vectorstore, args=("shoes",))
+            reader.start()
+            readers.append(reader)
+            reader.join(timeout=0.2)
+        
+        vectorstore.save_local = save_and_read
+        service.add_documents([Document(page_content="shoes product new")], catalog_id="shoes")
+        readers[0].join()
+        
+        listener.assert_called_once_with("shoes")
+        assert service.get_stats()["loads"] == 1
+
+    def test_embedding_respects_breaker_and_deadline(self, service):
+        service.similarity_search("shoes product 1", k=1, catalog_id="shoes")
+        breaker = CircuitBreaker("test", failure_threshold=1, recovery_timeout=60)
+        breaker._on_failure()
+        service.embedding_caller.breaker = breaker
+        service.embeddings = Mock(wraps=service.embeddings)
+        
+        # Repeated queries are served from cached embeddings while the circuit is open
+        docs = service.similarity_search("shoes product 1", k=1, catalog_id="shoes")
+        assert docs[0].page_content.startswith("shoes")
+        
+        with pytest.raises(CircuitOpenError):
+            service.similarity_search("shoes product 2", k=1, catalog_id="shoes")
+        with pytest.raises(LLMDeadlineExceeded):
+            service.similarity_search("shoes product 3", k=1, catalog_id="shoes", deadline=time.monotonic() - 1)
+        service.embeddings.embed_query.assert_not_called()
+
+class TestCatalogCacheInvalidation:
+    
+    def test_responder_drops_only_changed_catalog(self):
+        from app.agents.responder import ResponderAgent
+        
+        with patch('app.agents.responder.ChatOpenAI'):
+            responder = ResponderAgent()
+        responder._cache_answer(("shoes", "price", ""), "$60")
+        responder._cache_answer(("bags", "price", ""), "$30")
+        
+        responder.invalidate_catalog("shoes")
+        
+        assert list(responder._answer_cache) == [("bags", "price", "")]
+    
+    def test_unknown_catalog_returns_404(self, test_client):
+        response = test_client.post("/api/query", json={
+            "user_id": "test_user",
+            "query": "Do you have backpacks?",
+            "catalog_id": "missing_catalog"
+        })
+        assert response.status_code == 404